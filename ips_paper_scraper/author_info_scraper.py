@@ -4,9 +4,24 @@ import time
 import random
 import urllib.parse
 from difflib import SequenceMatcher
-from bs4 import BeautifulSoup
 from seleniumbase import Driver
 
+# One scripted pass returns everything the rescue loop needs - captcha status,
+# first profile card, URL and affiliation - in a single round trip instead of
+# shipping and parsing the whole page source
+_EXTRACT_PROFILE_JS = """
+const profile = document.querySelector('.gsc_1usr');
+const link = profile ? profile.querySelector('.gs_ai_name a') : null;
+const affil = profile ? profile.querySelector('.gs_ai_aff') : null;
+return {
+    captcha: document.body.innerText.includes('detected unusual traffic')
+        || !!document.querySelector('#gs_captcha_ccl'),
+    found: !!profile,
+    href: link ? link.getAttribute('href') : null,
+    affiliation: affil ? affil.innerText.trim() : null
+};
+"""
+
 class Phase3EnrichmentEngine:
     def __init__(self, db_path="neurips_research.db"):
         self.db_path = db_path
@@ -137,22 +152,18 @@ class Phase3EnrichmentEngine:
                 driver.uc_open_with_reconnect(search_url, reconnect_time=3)
                 time.sleep(random.uniform(4, 8)) 
                 
-                soup = BeautifulSoup(driver.get_page_source(), "html.parser")
-                
-                if "detected unusual traffic" in soup.text or 'id="gs_captcha_ccl"' in soup.text:
+                result = driver.execute_script(_EXTRACT_PROFILE_JS)
+
+                if result['captcha']:
                     print("   🚨 CAPTCHA triggered! Google caught us. Stopping rescue mission.")
                     break
-                
-                first_profile = soup.select_one('.gsc_1usr')
-                
-                if first_profile:
-                    name_link = first_profile.select_one('.gs_ai_name a')
-                    if name_link and name_link.get('href'):
-                        clean_url = self.base_scholar_url + name_link['href'].split('&')[0] 
-                        
-                        affil_el = first_profile.select_one('.gs_ai_aff')
-                        affiliation = affil_el.text.strip() if affil_el else None
-                        
+
+                if result['found']:
+                    if result['href']:
+                        clean_url = self.base_scholar_url + result['href'].partition('&')[0]
+
+                        affiliation = result['affiliation'] or None
+
                         print(f"      ✅ URL: {clean_url}")
                         if affiliation: print(f"      🏛️ Affiliation: {affiliation}")
                             
@@ -1,7 +1,22 @@
 import sqlite3
 import time
 from seleniumbase import Driver
-from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+PAPER_LINK_SELECTOR = "li a[href^='/virtual/2024/poster/'], ul.Cards li a"
+
+# One executed script returns every title on the page in a single round trip,
+# instead of pulling the full page source and looping over parsed elements
+_EXTRACT_TITLES_JS = """
+return Array.from(document.querySelectorAll("%s"))
+    .map(a => a.textContent.trim());
+""" % PAPER_LINK_SELECTOR
+
+# Every way the site renders its pagination button, OR-joined so one probe
+# (and one click) covers them all
+NEXT_BUTTON_SELECTOR = 'a:contains("Next"), button:contains("Next"), .pagination .next'
 
 class NeurIPSGoogleScholarScraper:
     def __init__(self, db_name="neurips_research.db"):
@@ -63,13 +78,17 @@ class NeurIPSGoogleScholarScraper:
     def scrape_neurips_titles(self):
         """Scrapes ALL paper titles from NeurIPS 2024 handling Pagination."""
         print("\n🌐 Booting up browser to scrape NeurIPS 2024...")
-        driver = Driver(uc=True, headless=False) 
-        
+        # "eager" returns at DOMContentLoaded; the explicit wait below covers
+        # the paper list actually being rendered
+        driver = Driver(uc=True, headless=False, page_load_strategy="eager")
+
         try:
             # Start at the base URL (Page 1)
             driver.get("https://nips.cc/virtual/2024/papers.html")
             print("⏳ Waiting for initial load...")
-            time.sleep(5) 
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, PAPER_LINK_SELECTOR))
+            )
             
             conn = sqlite3.connect(self.db_name)
             cursor = conn.cursor()
@@ -80,27 +99,21 @@ class NeurIPSGoogleScholarScraper:
             while True:
                 print(f"\n📄 Scraping Page {page_num}...")
                 
-                # 1. Extract the HTML for the current page
-                html = driver.get_page_source()
-                soup = BeautifulSoup(html, "html.parser")
-                
-                papers = soup.select("li a[href^='/virtual/2024/poster/'], ul.Cards li a") 
-                
-                if not papers:
+                # 1. Extract every title on the current page in one scripted pass
+                titles = driver.execute_script(_EXTRACT_TITLES_JS)
+
+                if not titles:
                     print("   ⚠️ No papers found on this page. We might be done.")
                     break
-                    
+
                 page_count = 0
-                for paper in papers:
-                    title = paper.text.strip()
+                for title in titles:
                     if title:
-                        try:
-                            # Save to database
-                            cursor.execute('INSERT INTO papers (title, conference, year) VALUES (?, ?, ?)', 
-                                         (title, 'NeurIPS', 2024))
-                            page_count += 1
-                        except sqlite3.IntegrityError:
-                            pass # Skip if we already saved this title
+                        # OR IGNORE skips titles we already saved, without the
+                        # cost of raising and catching an IntegrityError each time
+                        cursor.execute('INSERT OR IGNORE INTO papers (title, conference, year) VALUES (?, ?, ?)',
+                                     (title, 'NeurIPS', 2024))
+                        page_count += cursor.rowcount
                 
                 total_count += page_count
                 conn.commit()
@@ -109,10 +122,10 @@ class NeurIPSGoogleScholarScraper:
                 # 2. Try to find and click the "Next" page button
                 try:
                     # We check if a "Next" link or button is visible on the screen
-                    if driver.is_element_visible('a:contains("Next")') or driver.is_element_visible('button:contains("Next")') or driver.is_element_visible('.pagination .next'):
+                    if driver.is_element_visible(NEXT_BUTTON_SELECTOR):
                         print("   ➡️ Clicking 'Next' page...")
                         # Click it using SeleniumBase's text selector
-                        driver.click('a:contains("Next"), button:contains("Next"), .pagination .next')
+                        driver.click(NEXT_BUTTON_SELECTOR)
                         
                         # Wait for the next 400 papers to fully load
                         time.sleep(4) 
@@ -1,12 +1,18 @@
 import sqlite3
 import time
 import random
+import re
 import urllib.parse
 import os
 from datetime import datetime
+from difflib import SequenceMatcher
 from seleniumbase import Driver
 from bs4 import BeautifulSoup
 
+# Compiled once at import - both run for every result card we score
+_BRACKET_TAG_RE = re.compile(r'^\[.*?\]\s*')
+_VENUE_SPLIT_RE = re.compile(r'\s+[-–—]\s+')
+
 class GoogleScholarScraper:
     def __init__(self, db_name="neurips_research.db", session_dir="sessions"):
         self.db_name = db_name
@@ -252,17 +258,11 @@ class GoogleScholarScraper:
 
     def _process_paper(self, cursor, paper_id, title):
         """Process a single paper"""
-        import re
-        from difflib import SequenceMatcher
-        from datetime import datetime
-        
         # Build search URL
-        import urllib.parse
         encoded_title = urllib.parse.quote(title)
         search_url = f"{self.base_url}/scholar?hl=en&q={encoded_title}"
-        
+
         # Navigate to search with randomized timing
-        import time, random
         time.sleep(random.uniform(1, 2))
         self.driver.uc_open_with_reconnect(search_url, reconnect_time=3)
         time.sleep(random.uniform(3, 5))
@@ -272,8 +272,7 @@ class GoogleScholarScraper:
         
         # Get page content
         html = self.driver.get_page_source()
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml")
         
         # Check for blocks
         block_type = self._detect_block(html)
@@ -291,7 +290,7 @@ class GoogleScholarScraper:
                 time.sleep(random.uniform(3, 5))
                 
                 html = self.driver.get_page_source()
-                soup = BeautifulSoup(html, "html.parser")
+                soup = BeautifulSoup(html, "lxml")
                 
                 # Check again
                 block_type = self._detect_block(html)
@@ -319,7 +318,7 @@ class GoogleScholarScraper:
                 title_el = result.select_one('.gs_rt') 
                 
             raw_title = title_el.text.strip() if title_el else ""
-            clean_title = re.sub(r'^\[.*?\]\s*', '', raw_title)
+            clean_title = _BRACKET_TAG_RE.sub('', raw_title)
             
             similarity = SequenceMatcher(None, title.lower(), clean_title.lower()).ratio()
             
@@ -378,7 +377,7 @@ class GoogleScholarScraper:
                 all_author_names = [name.strip() for name in clean_author_div.text.split(',') if name.strip()]
             else:
                 full_text = author_div.text.replace('\xa0', ' ')
-                parts = re.split(r'\s+[-–—]\s+', full_text)
+                parts = _VENUE_SPLIT_RE.split(full_text)
                 author_chunk = parts[0].replace('\u2026', '').replace('...', '').strip()
                 all_author_names = [name.strip() for name in author_chunk.split(',') if name.strip()]
             
@@ -1,29 +1,173 @@
+import os
 import time
 import random
 import re
+import csv
 import hashlib
-import pandas as pd
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import requests
 from seleniumbase import Driver
-from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+# How many author profiles we fetch in flight at once (HTTP only, the browser stays serialized)
+AUTHOR_CONCURRENCY = 8
+
+# The batch endpoint returns citation counts for up to 1000 authors per POST; we stay well under
+S2_AUTHOR_BATCH_URL = "https://api.semanticscholar.org/graph/v1/author/batch"
+S2_BATCH_SIZE = 500
+
+# Citation counts move slowly, so a week-old cached value is good enough to
+# skip re-resolving an author we have seen in a previous run
+AUTHOR_CACHE_TTL = 7 * 24 * 3600
+
+# Compiled once at import - these run for every author we parse
+_NUM_RE = re.compile(r'(\d+)')
+# Both phrasings the site uses, OR-joined so the text fallback is one scan
+_CITATIONS_FALLBACK_RE = re.compile(
+    r'([\d,]+)\s*Citations?|Citations?\s*[:\-]?\s*([\d,]+)', re.IGNORECASE)
+
+# Pull the trailing ID out of /paper/<slug>/<id> and /author/<slug>/<id> hrefs
+# without allocating a split list per card
+_PAPER_ID_RE = re.compile(r'/paper/(?:[^/]+/)?([^/?#]+)')
+_AUTHOR_ID_RE = re.compile(r'/author/(?:[^/]+/)?([^/?#]+)')
+
+# Selector alternatives are OR-joined once here so the explicit waits and the JS
+# extractor always probe the same thing in a single engine pass
+SEARCH_CARD_SELECTOR = '.cl-paper-row, [data-test-id="search-result"]'
+PAPER_TITLE_SELECTOR = 'h3, h2, .cl-paper-title'
+AUTHOR_CARD_SELECTOR = '.author-detail-card__stats-row__value, .author-detail-card'
+
+# One execute_script round trip pulls every card's fields, instead of shipping the
+# full multi-MB page source back to Python just to re-parse it
+_EXTRACT_CARDS_JS = """
+return Array.from(document.querySelectorAll('%s')).map(card => ({
+    title: card.querySelector('%s')?.textContent || null,
+    href: card.querySelector('a[href*="/paper/"]')?.getAttribute('href') || null,
+    authors: Array.from(card.querySelectorAll('a[href*="/author/"]')).map(a => ({
+        name: a.textContent,
+        href: a.getAttribute('href')
+    }))
+}));
+""" % (SEARCH_CARD_SELECTOR, PAPER_TITLE_SELECTOR)
+
+# Same trick on the author fallback path: the stats rows and fallback texts come
+# back together in one trip instead of the whole page source
+_EXTRACT_AUTHOR_STATS_JS = """
+const card = document.querySelector('.author-detail-card');
+const main = document.querySelector('main[role="main"], main, #app');
+return {
+    rows: Array.from(document.querySelectorAll('.author-detail-card__stats-row')).map(row => ({
+        label: row.querySelector('.author-detail-card__stats-row__label')?.innerText || '',
+        value: row.querySelector('.author-detail-card__stats-row__value')?.innerText || ''
+    })),
+    card_text: card ? card.innerText : '',
+    main_text: (main || document.body).innerText
+};
+"""
+
+class _RateLimiter:
+    """Shared token bucket that self-tunes to the server instead of a blind fixed delay."""
+    def __init__(self, rate_per_sec=3.0, min_rate=0.2, max_rate=10.0):
+        self._rate = rate_per_sec
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            interval = 1.0 / self._rate
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def reward(self):
+        """Server is happy - creep back up towards the ceiling."""
+        with self._lock:
+            self._rate = min(self._rate * 1.25, self._max_rate)
+
+    def penalize(self, retry_after=None):
+        """Got throttled - halve the rate and respect Retry-After when given."""
+        with self._lock:
+            self._rate = max(self._rate / 2.0, self._min_rate)
+            if retry_after:
+                self._next_slot = time.monotonic() + retry_after
+
+def _append_row(columns, row):
+    """Appends one record to a column-wise (dict of lists) store."""
+    for key, value in row.items():
+        columns[key].append(value)
+
 class SemanticScholarScraper:
-    def __init__(self, query: str = "computer architecture", limit: int = 50):
+    def __init__(self, query: str = "computer architecture", limit: int = 50,
+                 session_dir: str = "sessions", concurrency: int = AUTHOR_CONCURRENCY):
         self.query = query
         self.limit = limit
+        self.concurrency = max(1, concurrency)
         self.base_url = "https://www.semanticscholar.org"
-        self.papers = []
+        self.session_dir = session_dir
+        os.makedirs(session_dir, exist_ok=True)
+        # Column-wise stores: pandas can adopt these lists directly at export
+        # instead of re-boxing a list of per-row dicts
+        self.papers = {"paper_id": [], "title": [], "url": []}
         self.authors = {}
-        self.paper_authors = []
+        self.paper_authors = {"paper_id": [], "author_id": [], "author_order": []}
+        # O(1) dedupe at insertion time, so export never has to re-scan
+        self._seen_papers = set()
+        self._seen_pa = set()
+        # The column stores are flushed to disk per page, so track the total
+        # paper count separately and keep the open writers here
+        self._papers_collected = 0
+        self._csv_files = {}
+        self._csv_writers = {}
+        # One warm session + limiter for the whole crawl, so API batches reuse
+        # pooled TCP connections instead of handshaking per page
+        self._api_session = requests.Session()
+        self._api_limiter = _RateLimiter()
+        # An API key buys a much higher rate limit; anonymous access still works
+        api_key = os.environ.get("S2_API_KEY")
+        if api_key:
+            self._api_session.headers["x-api-key"] = api_key
+        # Warm cache across runs: authors resolved in a previous crawl are
+        # looked up here instead of hitting the API or the browser again.
+        # Only the main thread touches this connection.
+        self._cache_conn = sqlite3.connect(os.path.join(session_dir, "author_cache.db"))
+        self._cache_conn.execute('''
+            CREATE TABLE IF NOT EXISTS author_cache (
+                author_id TEXT PRIMARY KEY,
+                citation_count INTEGER,
+                ts INTEGER
+            )
+        ''')
+        self._cache_conn.commit()
         self.driver = None  # We now track the driver at the class level
 
     def _start_browser(self):
         """Spins up a fresh browser instance and clears initial checks."""
         self._kill_browser()  # Ensure any old instances are dead
         print("   Starting a fresh browser instance...")
-        self.driver = Driver(uc=True, headless=False)
+        # "eager" returns at DOMContentLoaded instead of waiting for every
+        # subresource; the explicit WebDriverWaits cover correctness.
+        # block_images skips the heaviest payloads - we only read text anyway.
+        # The persistent profile keeps the site's trust cookies between runs
+        # and restarts, same trick as the Google Scholar scraper.
+        profile_path = os.path.join(os.getcwd(), self.session_dir, "ss_chrome_profile")
+        self.driver = Driver(
+            uc=True,
+            headless=False,
+            page_load_strategy="eager",
+            block_images=True,
+            chromium_arg="--disable-remote-fonts",
+            user_data_dir=profile_path,
+        )
         self.driver.uc_open_with_reconnect(self.base_url, reconnect_time=5)
         time.sleep(3)
 
@@ -52,7 +196,11 @@ class SemanticScholarScraper:
     def _handle_verification(self):
         """Attempts to bypass human verification popups."""
         try:
-            if "verify" in self.driver.current_url.lower() or self.driver.is_element_present("iframe[src*='turnstile']"):
+            challenged = self.driver.execute_script(
+                "return window.location.href.toLowerCase().includes('verify')"
+                " || !!document.querySelector(\"iframe[src*='turnstile']\");"
+            )
+            if challenged:
                 print(" CAPTCHA detected! Attempting bypass...", end=" ")
                 self.driver.uc_gui_click_captcha()
                 time.sleep(4)
@@ -61,8 +209,14 @@ class SemanticScholarScraper:
 
     def _scrape_interleaved(self):
         page_count = 1
-        
-        while len(self.papers) < self.limit:
+        pending = []
+
+        # Producer/consumer split: pagination produces author chunks, this
+        # standing pool consumes them, so the browser can already be navigating
+        # to the next search page while page N's authors resolve
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        while self._papers_collected < self.limit:
             search_url = f"{self.base_url}/search?q={self.query.replace(' ', '%20')}&sort=relevance&page={page_count}"
             print(f"\n⚓ Loading Search Page {page_count}...")
             
@@ -72,17 +226,15 @@ class SemanticScholarScraper:
 
                 # Wait for search results
                 WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".cl-paper-row, [data-test-id='search-result']"))
+                    EC.presence_of_element_located((By.CSS_SELECTOR, SEARCH_CARD_SELECTOR))
                 )
             except Exception as e:
                 print(f"   Page {page_count} blocked or failed to load. Initiating Hard Reset...")
                 self._start_browser()
                 continue  # Retry the exact same search page
             
-            html = self.driver.get_page_source()
-            soup = BeautifulSoup(html, "html.parser")
-            cards = soup.select(".cl-paper-row, [data-test-id='search-result']")
-            
+            cards = self.driver.execute_script(_EXTRACT_CARDS_JS)
+
             if not cards:
                 print("   No paper cards found on this page. Moving to next.")
                 page_count += 1
@@ -91,132 +243,264 @@ class SemanticScholarScraper:
             author_queue = []
 
             for card in cards:
-                if len(self.papers) >= self.limit: break
-                
-                title_el = card.select_one('h3, h2, .cl-paper-title')
-                title = title_el.text.strip() if title_el else "Unknown"
-                link_el = card.select_one('a[href*="/paper/"]')
-                paper_url = self.base_url + link_el['href'] if link_el else "N/A"
-                paper_id = paper_url.split('/')[-1] if paper_url != "N/A" else hashlib.md5(title.encode()).hexdigest()[:16]
-
-                self.papers.append({"paper_id": paper_id, "title": title, "url": paper_url})
-                
-                for order, auth_el in enumerate(card.select('a[href*="/author/"]'), 1):
-                    auth_href = auth_el.get('href', '')
-                    if not auth_href: continue
-                    auth_id = auth_href.split('/')[-1]
-                    
-                    self.paper_authors.append({"paper_id": paper_id, "author_id": auth_id, "author_order": order})
-                    
+                if self._papers_collected >= self.limit: break
+
+                title = (card.get('title') or "Unknown").strip()
+                link_href = card.get('href')
+                paper_url = urljoin(self.base_url, link_href) if link_href else "N/A"
+                id_match = _PAPER_ID_RE.search(link_href or '')
+                if id_match:
+                    paper_id = id_match.group(1)
+                else:
+                    # Last-resort synthetic ID, only when the card had no paper link
+                    paper_id = hashlib.blake2b(title.encode(), digest_size=8).hexdigest()
+
+                if paper_id in self._seen_papers:
+                    continue
+                self._seen_papers.add(paper_id)
+                self._papers_collected += 1
+                _append_row(self.papers, {"paper_id": paper_id, "title": title, "url": paper_url})
+
+                for order, auth in enumerate(card.get('authors') or [], 1):
+                    auth_href = auth.get('href') or ''
+                    id_match = _AUTHOR_ID_RE.search(auth_href)
+                    if not id_match: continue
+                    auth_id = id_match.group(1)
+
+                    pair = (paper_id, auth_id)
+                    if pair in self._seen_pa:
+                        continue
+                    self._seen_pa.add(pair)
+                    _append_row(self.paper_authors, {"paper_id": paper_id, "author_id": auth_id, "author_order": order})
+
                     if auth_id not in self.authors:
                         self.authors[auth_id] = {
-                            "author_id": auth_id, 
-                            "author_name": auth_el.text.strip(), 
-                            "author_profile_url": self.base_url + auth_href, 
-                            "citation_count": None
+                            "author_id": auth_id,
+                            "author_name": (auth.get('name') or '').strip(),
+                            "author_profile_url": urljoin(self.base_url, auth_href),
+                            "citation_count": self._cache_lookup(auth_id)
                         }
-                        author_queue.append(auth_id)
+                        if self.authors[auth_id]["citation_count"] is None:
+                            author_queue.append(auth_id)
 
             if author_queue:
-                print(f"   👥 Processing {len(author_queue)} authors...")
-                idx = 0
-                retries = 0
-                
-                # Using a while loop so we can retry the same index if it fails
-                while idx < len(author_queue):
-                    aid = author_queue[idx]
-                    try:
-                        self._scrape_single_author(aid)
-                        time.sleep(random.uniform(2.0, 3.5))
-                        idx += 1       # Success
-                        retries = 0    # Reset retries
-                        
-                    except Exception as e:
-                        retries += 1
-                        print(f"\n      💥 Browser crashed or blocked! (Attempt {retries}/3)")
-                        
-                        if retries > 2:
-                            print(f"      ⏭️ Skipping author {aid} after 3 failed browser resets.")
-                            idx += 1
-                            retries = 0
-                        else:
-                            self._start_browser() # The Hard Reset
+                print(f"   👥 Resolving {len(author_queue)} authors via the batch API...")
+                for i in range(0, len(author_queue), S2_BATCH_SIZE):
+                    chunk = author_queue[i:i + S2_BATCH_SIZE]
+                    pending.append(pool.submit(self._resolve_citation_chunk, chunk))
 
+            # Stream this page's rows to disk so peak memory stays O(page size)
+            self._flush_rows()
             page_count += 1
 
+        pool.shutdown(wait=True)
+        leftovers = [aid for future in pending for aid in future.result()]
+        if leftovers:
+            self._scrape_authors_via_browser(leftovers)
+
+    def _resolve_citation_chunk(self, chunk):
+        """One consumer unit: resolves a batch of author IDs through the API.
+
+        One POST covers up to 500 authors, so the whole author phase is a
+        handful of JSON requests instead of a browser navigation per author.
+        Returns the IDs the API could not resolve; those go through the
+        (serialized) browser path once pagination is done.
+        """
+        try:
+            return self._fetch_citation_batch(self._api_session, self._api_limiter, chunk)
+        except Exception:
+            return list(chunk)
+
+    def _scrape_authors_via_browser(self, fallback):
+        """Serialized browser pass for the authors the API could not resolve."""
+        print(f"      🐢 Falling back to the browser for {len(fallback)} authors...")
+        idx = 0
+        retries = 0
+        # Starts around the old ~2.5s pacing but adapts to how the site responds
+        limiter = _RateLimiter(rate_per_sec=0.4, min_rate=0.1, max_rate=1.0)
+
+        # Using a while loop so we can retry the same index if it fails
+        while idx < len(fallback):
+            aid = fallback[idx]
+            limiter.wait()
+            try:
+                self._scrape_single_author(aid)
+                limiter.reward()
+                idx += 1       # Success
+                retries = 0    # Reset retries
+
+            except Exception as e:
+                limiter.penalize()
+                retries += 1
+                print(f"\n      💥 Browser crashed or blocked! (Attempt {retries}/3)")
+
+                if retries > 2:
+                    print(f"      ⏭️ Skipping author {aid} after 3 failed attempts.")
+                    idx += 1
+                    retries = 0
+                elif retries == 2:
+                    self._start_browser() # The Hard Reset
+                # First failure just retries on the existing session
+
+    def _fetch_citation_batch(self, session, limiter, chunk):
+        """POSTs one batch of author IDs; returns the IDs the API could not resolve."""
+        for attempt in range(4):
+            limiter.wait()
+            resp = session.post(
+                S2_AUTHOR_BATCH_URL,
+                params={"fields": "citationCount,name"},
+                json={"ids": chunk},
+                timeout=30,
+            )
+            if resp.status_code in (429, 503):
+                retry_after = resp.headers.get('Retry-After')
+                wait = float(retry_after) if retry_after else 2 ** attempt + random.uniform(0, 1)
+                limiter.penalize(wait)
+                print(f"      😴 API throttled us, backing off {wait:.1f}s...")
+                time.sleep(wait)
+                continue
+            resp.raise_for_status()
+            limiter.reward()
+            break
+        else:
+            return list(chunk)
+
+        unresolved = []
+        for aid, record in zip(chunk, resp.json()):
+            if record and record.get('citationCount') is not None:
+                self.authors[aid]['citation_count'] = record['citationCount']
+                # The card name can be blank or truncated; prefer the API's canonical one
+                if record.get('name') and not self.authors[aid]['author_name']:
+                    self.authors[aid]['author_name'] = record['name']
+            else:
+                unresolved.append(aid)
+        return unresolved
+
     def _scrape_single_author(self, author_id):
         author_data = self.authors[author_id]
         print(f"      👤 {author_data['author_name'][:30]}...", end=" ", flush=True)
+
+        # Plain navigation on the warm session - the reconnect dance is only worth
+        # paying when we actually get challenged, not on every author
+        self.driver.get(author_data['author_profile_url'])
         
-        self.driver.uc_open_with_reconnect(author_data['author_profile_url'], reconnect_time=3)
-        
+        # The OR-joined selector makes this one wait cover every card variant,
+        # so there is no per-selector retry ladder
         try:
             WebDriverWait(self.driver, 8).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".author-detail-card__stats-row__value, .author-detail-card"))
+                EC.presence_of_element_located((By.CSS_SELECTOR, AUTHOR_CARD_SELECTOR))
             )
         except:
             self._handle_verification()
             # If it still fails after trying to handle it, we force an error to trigger the Hard Reset
             WebDriverWait(self.driver, 3).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".author-detail-card"))
+                EC.presence_of_element_located((By.CSS_SELECTOR, AUTHOR_CARD_SELECTOR))
             )
 
-        html = self.driver.get_page_source()
-        soup = BeautifulSoup(html, "html.parser")
-        citation_count = self._extract_author_citations_only(soup)
-        
+        stats = self.driver.execute_script(_EXTRACT_AUTHOR_STATS_JS)
+        citation_count = self._extract_author_citations_only(stats)
+
         self.authors[author_id]['citation_count'] = citation_count
         print(f"✓ {citation_count}")
 
-    def _extract_author_citations_only(self, soup):
+    def _extract_author_citations_only(self, stats):
         citation_count = None
-        stats_rows = soup.select('.author-detail-card__stats-row')
-        for row in stats_rows:
-            label = row.select_one('.author-detail-card__stats-row__label')
-            value = row.select_one('.author-detail-card__stats-row__value')
-            if label and value:
-                label_text = label.get_text().strip().lower()
-                if 'citation' in label_text and 'influential' not in label_text:
-                    value_text = value.get_text().replace(',', '').strip()
-                    if 'k' in value_text.lower():
-                        try:
-                            citation_count = int(float(value_text.lower().replace('k', '')) * 1000)
-                            break
-                        except: pass
-                    else:
-                        match = re.search(r'(\d+)', value_text)
-                        if match:
-                            citation_count = int(match.group(1))
-                            break
-        
+        for row in stats.get('rows') or []:
+            label_text = row.get('label', '').strip().lower()
+            if 'citation' in label_text and 'influential' not in label_text:
+                value_text = row.get('value', '').replace(',', '').strip()
+                if 'k' in value_text.lower():
+                    try:
+                        citation_count = int(float(value_text.lower().replace('k', '')) * 1000)
+                        break
+                    except: pass
+                else:
+                    match = _NUM_RE.search(value_text)
+                    if match:
+                        citation_count = int(match.group(1))
+                        break
+
         if citation_count is None:
-            page_text = soup.get_text()
-            if "Co-Authors" in page_text or "Co-Author" in page_text:
-                main_section = page_text.split("Co-Author")[0]
+            # Single fallback pass: the small card text first, then the trimmed
+            # main text, with one combined regex covering "1,234 Citations" and
+            # "Citations: 1,234" orderings
+            main_text = stats.get('main_text') or ''
+            if "Co-Author" in main_text:
+                main_text = main_text.partition("Co-Author")[0]
             else:
-                main_section = page_text[:2000]
-            match = re.search(r'([\d,]+)\s+Citations', main_section)
-            if match:
-                citation_count = int(match.group(1).replace(',', ''))
-        
-        if citation_count is None:
-            main_card = soup.select_one('.author-detail-card')
-            if main_card:
-                card_text = main_card.get_text()
-                match = re.search(r'([\d,]+)\s+Citations', card_text)
+                main_text = main_text[:2000]
+            for text in (stats.get('card_text') or '', main_text):
+                match = _CITATIONS_FALLBACK_RE.search(text)
                 if match:
-                    citation_count = int(match.group(1).replace(',', ''))
-        
+                    citation_count = int((match.group(1) or match.group(2)).replace(',', ''))
+                    break
+
         return citation_count if citation_count else 0
 
+    def _cache_lookup(self, author_id):
+        """Returns the cached citation count for an author, or None if stale/missing."""
+        row = self._cache_conn.execute(
+            "SELECT citation_count, ts FROM author_cache WHERE author_id = ?",
+            (author_id,)).fetchone()
+        if row and time.time() - row[1] < AUTHOR_CACHE_TTL:
+            return row[0]
+        return None
+
+    def _cache_store(self):
+        """Persists every resolved citation count so the next run can skip them."""
+        now = int(time.time())
+        self._cache_conn.executemany(
+            "INSERT OR REPLACE INTO author_cache (author_id, citation_count, ts) VALUES (?, ?, ?)",
+            [(a["author_id"], a["citation_count"], now)
+             for a in self.authors.values() if a["citation_count"] is not None])
+        self._cache_conn.commit()
+
     def _export_data(self):
         try:
-            pd.DataFrame(self.papers).drop_duplicates(subset='paper_id').to_csv("papers.csv", index=False)
-            pd.DataFrame(list(self.authors.values())).to_csv("authors.csv", index=False)
-            pd.DataFrame(self.paper_authors).drop_duplicates().to_csv("paper_authors.csv", index=False)
+            self._flush_rows()
+            self._cache_store()
+            # Authors are keyed by id, so they are already deduped - a plain
+            # DictWriter pass avoids materialising a DataFrame just to write rows
+            with open("authors.csv", "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(
+                    f, fieldnames=["author_id", "author_name", "author_profile_url", "citation_count"])
+                writer.writeheader()
+                writer.writerows(self.authors.values())
             print("   Data successfully exported to CSVs.")
         except Exception as e:
             print(f"   Failed to export data: {e}")
+        finally:
+            for f in self._csv_files.values():
+                f.close()
+            self._csv_files.clear()
+            self._csv_writers.clear()
+            self._cache_conn.close()
+
+    def _flush_rows(self):
+        """Appends the buffered papers/paper_authors rows to disk and clears the buffers.
+
+        Rows are already deduped at insertion time, so each flush is a plain
+        writerows; authors stay in memory since their citation counts arrive
+        later.
+        """
+        self._flush_csv("papers.csv", self.papers)
+        self._flush_csv("paper_authors.csv", self.paper_authors)
+
+    def _flush_csv(self, path, columns):
+        if not next(iter(columns.values())):
+            return
+        writer = self._csv_writers.get(path)
+        if writer is None:
+            f = open(path, "w", newline="", encoding="utf-8")
+            self._csv_files[path] = f
+            writer = self._csv_writers[path] = csv.writer(f)
+            writer.writerow(list(columns))
+        writer.writerows(zip(*columns.values()))
+        # Push the page's rows to the OS now - a crash mid-crawl loses at most
+        # the current page, not everything since the last flush
+        self._csv_files[path].flush()
+        for col in columns.values():
+            col.clear()
 
 if __name__ == "__main__":
     scraper = SemanticScholarScraper(query="computer architecture", limit=50)